@@ -1,13 +1,18 @@
-from typing import Optional
+import json
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.security import (
     HTTPBearer,
     HTTPAuthorizationCredentials,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from app.api.deps import get_db
+from app.core.config import settings
 from app.services.agent_service import AgentService
+from app.services.batch_service import BatchChatService
+from app.services.speculative import speculation_stats
 
 router = APIRouter()
 
@@ -22,6 +27,14 @@ class ChatResponse(BaseModel):
     response: str
 
 
+class BatchChatRequest(BaseModel):
+    messages: List[str] = Field(
+        ..., min_length=1, max_length=settings.BATCH_MAX_MESSAGES
+    )
+    # Mais workers que conexões reservadas ao batch só ficariam esperando
+    concurrency: Optional[int] = Field(None, ge=1, le=settings.BATCH_DB_CONNECTIONS)
+
+
 @router.post("/message", response_model=ChatResponse)
 async def chat_endpoint(
     request: ChatRequest,
@@ -37,3 +50,35 @@ async def chat_endpoint(
         # Em produção, logue o erro real e retorne algo genérico
         print(f"Erro no Chat: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch")
+async def chat_batch_endpoint(
+    request: BatchChatRequest,
+    token_auth: Optional[HTTPAuthorizationCredentials] = Depends(security),
+):
+    """
+    Processa várias mensagens de uma vez (geração de FAQ, regressão de QA).
+    A resposta é um stream NDJSON com uma linha por mensagem de entrada:
+    {"index": 0, "message": "...", "response": "..."} ou {..., "error": "..."}.
+    """
+    full_token = f"Bearer {token_auth.credentials}" if token_auth else None
+    service = BatchChatService(
+        user_token=full_token,
+        concurrency=min(
+            request.concurrency or settings.BATCH_CONCURRENCY,
+            settings.BATCH_DB_CONNECTIONS,
+        ),
+    )
+
+    async def ndjson():
+        async for item in service.stream(request.messages):
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.get("/speculation-stats")
+async def speculation_stats_endpoint():
+    """Métricas da busca especulativa deste worker (SPECULATIVE_SEARCH)."""
+    return {"enabled": settings.SPECULATIVE_SEARCH, **speculation_stats.as_dict()}
@@ -1,7 +1,11 @@
+import asyncio
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
+from app.core.config import settings
 from app.models.product import ProductEmbedding
 from app.repositories.product import ProductRepository
 from app.services.llm_factory import get_embeddings
@@ -9,54 +13,105 @@ from app.services.llm_factory import get_embeddings
 router = APIRouter()
 
 
+def _current_rss_mb() -> Optional[float]:
+    """
+    Memória residente atual do processo (VmRSS, Linux). ru_maxrss não serve aqui:
+    é o pico da vida inteira do worker, incluindo requisições anteriores.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
 @router.post("/sync-products")
 async def sync_products(db: AsyncSession = Depends(get_db)):
     """
     Lê produtos da tabela original (Java) e gera vetores na tabela de IA.
+    Os produtos são lidos por um cursor no servidor em blocos de SYNC_CHUNK_SIZE;
+    cada bloco é gravado (flush) e removido da sessão (expunge), então a memória
+    não cresce com o tamanho do catálogo.
     ATENÇÃO: Este é um script simples. Em produção, use filas (RabbitMQ).
     """
     repo = ProductRepository(db)
     try:
-        # 1. Buscar produtos na tabela original (tb_product) via Repositório
-        products = await repo.get_products_for_sync()
-
-        if not products:
-            return {"message": "Nenhum produto encontrado na tabela tb_product."}
-
         embeddings_model = get_embeddings()
         count = 0
+        seen = 0
+        rss_before_mb = _current_rss_mb()
+        peak_rss_mb = rss_before_mb
+
+        def sample_rss():
+            nonlocal peak_rss_mb
+            rss_mb = _current_rss_mb()
+            if rss_mb is not None and (peak_rss_mb is None or rss_mb > peak_rss_mb):
+                peak_rss_mb = rss_mb
 
-        for prod in products:
-            # 2. Verificar se já existe vetor para esse produto (evitar duplicação)
-            if await repo.exists_by_product_id(prod["id"]):
+        # 1. Ler produtos na tabela original (tb_product) em blocos via Repositório
+        async for chunk in repo.stream_products_for_sync(settings.SYNC_CHUNK_SIZE):
+            seen += len(chunk)
+
+            # 2. Ignorar produtos que já têm vetor (evitar duplicação)
+            existing = await repo.existing_product_ids([prod["id"] for prod in chunk])
+            new_products = [prod for prod in chunk if prod["id"] not in existing]
+            # Amostra com o bloco lido, mesmo que nada seja gravado
+            sample_rss()
+            if not new_products:
                 continue
 
             # 3. Criar o texto rico para vetorização
-            cat_name = (
-                prod["category_name"] if prod["category_name"] else "Sem Categoria"
-            )
-            content_text = f"Produto: {prod['name']}. Descrição: {prod['description']}"
+            texts = [
+                f"Produto: {prod['name']}. Descrição: {prod['description']}"
+                for prod in new_products
+            ]
 
-            # 4. Gerar Vetor (Chamada API Google)
-            vector = embeddings_model.embed_query(content_text)
+            # 4. Gerar Vetores do bloco (uma chamada API Google por bloco).
+            # task_type de consulta: mesmos vetores que o embed_query gerava antes
+            vectors = await asyncio.to_thread(
+                embeddings_model.embed_documents, texts, task_type="retrieval_query"
+            )
 
             # 5. Salvar no Banco
-            new_embedding = ProductEmbedding(
-                product_id=prod["id"],
-                embedding=vector,
-                content=content_text,
-                metadata_={
-                    "price": float(prod["price"]),
-                    "category": cat_name,
-                    "stock": int(prod["quantity_available_in_stock"]),
-                },
-            )
-            # Usando db session direto para batch (ou poderíamos adicionar métodos de batch ao repo)
-            db.add(new_embedding)
-            count += 1
+            batch = [
+                ProductEmbedding(
+                    product_id=prod["id"],
+                    embedding=vector,
+                    content=content_text,
+                    metadata_={
+                        "price": float(prod["price"]),
+                        "category": prod["category_name"] or "Sem Categoria",
+                        "stock": int(prod["quantity_available_in_stock"]),
+                    },
+                )
+                for prod, content_text, vector in zip(new_products, texts, vectors)
+            ]
+            db.add_all(batch)
+            await db.flush()
+            # Ponto mais alto do bloco: objetos, vetores e linhas ainda em memória
+            sample_rss()
+            # Libera os objetos do bloco; o commit final continua gravando tudo
+            for new_embedding in batch:
+                db.expunge(new_embedding)
+            count += len(batch)
+
+        if not seen:
+            return {"message": "Nenhum produto encontrado na tabela tb_product."}
 
         await db.commit()
-        return {"status": "success", "products_vectorized": count}
+        print(
+            f"📦 Ingestão: {count} vetorizados de {seen} produtos | "
+            f"RSS antes {rss_before_mb} MB, pico durante a ingestão {peak_rss_mb} MB"
+        )
+        return {
+            "status": "success",
+            "products_vectorized": count,
+            "rss_before_mb": rss_before_mb,
+            "peak_rss_mb": peak_rss_mb,
+        }
 
     except Exception as e:
         await db.rollback()
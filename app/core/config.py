@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -12,6 +14,8 @@ class Settings(BaseSettings):
     DB_USERNAME: str | None = None
     DB_PASSWORD: str | None = None
     DATABASE_URL: str | None = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
 
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
@@ -39,6 +43,34 @@ class Settings(BaseSettings):
     # BACKEND
     BACKEND_URL: str = "http://localhost:8080"
 
+    # Runtime
+    WARMUP_ON_STARTUP: bool = True
+
+    # Busca especulativa (inicia a busca no catálogo junto com a 1ª chamada à LLM)
+    SPECULATIVE_SEARCH: bool = False
+    # Reuso: fração mínima das palavras da query presentes na mensagem, e
+    # mensagem com no máximo MAX_LENGTH_RATIO vezes as palavras da query.
+    # Ajuste pelo hit_ratio/mismatches de GET /api/v1/chat/speculation-stats.
+    SPECULATIVE_SEARCH_MIN_OVERLAP: float = 0.6
+    SPECULATIVE_SEARCH_MAX_LENGTH_RATIO: float = 2.0
+
+    # Busca vetorial: "full" (vector), "halfvec" ou "binary".
+    # Nos modos compactos, VECTOR_RESCORE_FACTOR * limit candidatos são
+    # reordenados com o vetor completo.
+    VECTOR_SEARCH_MODE: Literal["full", "halfvec", "binary"] = "full"
+    VECTOR_RESCORE_FACTOR: int = 4
+
+    # Ingestão
+    SYNC_CHUNK_SIZE: int = 200
+
+    # Batch chat
+    # Conexões do pool que os batches podem usar ao mesmo tempo (somando todos
+    # os batches do worker). Fica abaixo de DB_POOL_SIZE para sobrar conexão ao
+    # /chat/message; para batches mais rápidos, aumente os dois juntos.
+    BATCH_DB_CONNECTIONS: int = 4
+    BATCH_CONCURRENCY: int = 4
+    BATCH_MAX_MESSAGES: int = 10000
+
     class Config:
         env_file = ".env"
         extra = "ignore"
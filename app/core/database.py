@@ -3,7 +3,13 @@ from sqlalchemy.orm import declarative_base
 from app.core.config import settings
 
 # Async connection
-engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, echo=False)
+engine = create_async_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    echo=False,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+)
 SessionLocal = async_sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
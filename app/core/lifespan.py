@@ -0,0 +1,104 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import List, Tuple
+
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.http_client import close_http_client, get_http_client
+
+
+class StartupReport:
+    """
+    Cronometra as fases de inicialização do worker e imprime um resumo,
+    para saber onde o cold start está gastando tempo.
+    """
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float, str]] = []
+
+    def record(self, name: str, seconds: float, status: str = "ok"):
+        self.phases.append((name, seconds, status))
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception as e:
+            # Warm-up é best-effort: uma falha aqui não pode derrubar o worker
+            status = f"erro: {e}"
+        finally:
+            self.record(name, time.perf_counter() - start, status)
+
+    def render(self) -> str:
+        total = sum(seconds for _, seconds, _ in self.phases)
+        lines = [f"⏱️ RiffHouse AI: startup em {total:.2f}s"]
+        for name, seconds, status in self.phases:
+            lines.append(f"   - {name:<28} {seconds * 1000:>8.0f} ms  [{status}]")
+        return "\n".join(lines)
+
+
+startup_report = StartupReport()
+
+
+async def _warm_db_pool():
+    """Abre DB_POOL_SIZE conexões em paralelo para que fiquem prontas no pool."""
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(settings.DB_POOL_SIZE)))
+
+
+def _warm_routing_chain():
+    """Imports tardios do AgentService e montagem da chain, sem chamar a LLM."""
+    import langchain_core.messages  # noqa: F401 (ToolMessage)
+
+    from app.services.agent_service import get_routing_chain
+
+    get_routing_chain()
+
+
+async def _warm_embeddings():
+    from app.services.llm_factory import get_embeddings
+
+    embeddings = get_embeddings()
+    await asyncio.to_thread(embeddings.embed_query, "warm-up")
+
+
+async def _warm_backend():
+    # Qualquer resposta serve: o objetivo é deixar a conexão TLS aberta
+    await get_http_client().head(settings.BACKEND_URL, timeout=2.0)
+
+
+async def warm_up(report: StartupReport):
+    from app.services.llm_factory import get_llm
+
+    with report.phase("pool do banco"):
+        await _warm_db_pool()
+    with report.phase("cliente LLM (Groq)"):
+        get_llm()
+    with report.phase("prompt + bind_tools"):
+        _warm_routing_chain()
+    with report.phase("embeddings (Google)"):
+        await _warm_embeddings()
+    with report.phase("backend Java"):
+        await _warm_backend()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.WARMUP_ON_STARTUP:
+        await warm_up(startup_report)
+    print(startup_report.render())
+
+    yield
+
+    await close_http_client()
+    await engine.dispose()
@@ -1,9 +1,16 @@
-from fastapi import FastAPI
-from app.api.v1 import chat, ingestion
-from app.core.config import settings
-from fastapi.middleware.cors import CORSMiddleware
+import time
 
-app = FastAPI(title=settings.PROJECT_NAME)
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI  # noqa: E402
+from app.api.v1 import chat, ingestion  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.lifespan import lifespan, startup_report  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+
+startup_report.record("import do app", time.perf_counter() - _import_started)
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 origins = [
     "*"
@@ -23,4 +30,4 @@ app.include_router(ingestion.router, prefix="/api/v1/ingestion", tags=["ingestio
 
 @app.get("/api/health")
 def health_check():
-    return {"status": "ok", "service": "RiffHouse AI"}
\ No newline at end of file
+    return {"status": "ok", "service": "RiffHouse AI"}
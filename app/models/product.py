@@ -1,16 +1,41 @@
-from sqlalchemy import Column, String, JSON, TIMESTAMP, text, BIGINT
+from typing import List
+
+from sqlalchemy import Column, String, JSON, TIMESTAMP, text, BIGINT, column, table
 from sqlalchemy.dialects.postgresql import UUID
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.orm import deferred
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
 from app.core.database import Base
 from sqlalchemy.dialects.postgresql import TSVECTOR
 
+EMBEDDING_DIM = 768
+
+
+def binary_quantize(vector: List[float]) -> str:
+    """Mesmo resultado do binary_quantize() do pgvector: 1 para valores > 0."""
+    return "".join("1" if value > 0 else "0" for value in vector)
+
+
 class ProductEmbedding(Base):
     __tablename__ = "product_embeddings"
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     product_id = Column(BIGINT, nullable=False)
-    embedding = Column(Vector(768)) 
+    # Deferred: as buscas ordenam pelo vetor no banco, mas não precisam
+    # trazer 768 floats por linha para o Python.
+    embedding = deferred(Column(Vector(EMBEDDING_DIM)))
     content = Column(String)
     metadata_ = Column("metadata", JSON)
     created_at = Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"))
-    search_vector = Column(TSVECTOR)
\ No newline at end of file
+    search_vector = Column(TSVECTOR)
+
+
+# Cópias compactas opcionais para a 1ª fase da busca (VECTOR_SEARCH_MODE).
+# São colunas geradas a partir de `embedding`, criadas por
+# scripts/compact_embeddings_{halfvec,binary}.sql, e ficam fora do mapeamento
+# do ORM: sem os scripts, a tabela e a ingestão funcionam como antes.
+product_embeddings_compact = table(
+    "product_embeddings",
+    column("id", UUID(as_uuid=True)),
+    column("embedding_half", HALFVEC(EMBEDDING_DIM)),
+    column("embedding_bin", BIT(EMBEDDING_DIM)),
+)
@@ -1,9 +1,14 @@
-from typing import Any, Dict, List
+from typing import AsyncIterator, List, Sequence, Set
 
-from sqlalchemy import select, func, text, cast, Numeric, Text
+from sqlalchemy import RowMapping, select, func, text, cast, Numeric, Text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.product import ProductEmbedding
+from app.core.config import settings
+from app.models.product import (
+    ProductEmbedding,
+    binary_quantize,
+    product_embeddings_compact,
+)
 from app.repositories.base import BaseRepository
 
 
@@ -11,11 +16,14 @@ class ProductRepository(BaseRepository[ProductEmbedding]):
     def __init__(self, db: AsyncSession):
         super().__init__(db, ProductEmbedding)
 
-    async def get_products_for_sync(self) -> List[Dict[str, Any]]:
+    async def stream_products_for_sync(
+        self, chunk_size: int
+    ) -> AsyncIterator[Sequence[RowMapping]]:
         """
-        Fetches products from the legacy 'tb_product' table joined with 'tb_category'.
+        Streams products from the legacy 'tb_product' table joined with 'tb_category'
+        through a server-side cursor, yielding chunks of at most `chunk_size` rows.
         """
-        result = await self.db.execute(
+        result = await self.db.stream(
             text("""
             SELECT 
                 p.id, 
@@ -28,28 +36,61 @@ class ProductRepository(BaseRepository[ProductEmbedding]):
                 c.name as category_name
             FROM tb_product p
             LEFT JOIN tb_category c ON p.category_id = c.id
-        """)
+        """).execution_options(yield_per=chunk_size)
         )
-        return result.mappings().all()
+        async for chunk in result.mappings().partitions(chunk_size):
+            yield chunk
 
-    async def exists_by_product_id(self, product_id: int) -> bool:
+    async def existing_product_ids(self, product_ids: List[int]) -> Set[int]:
+        """
+        Returns which of the given product ids already have an embedding.
+        """
         result = await self.db.execute(
-            select(self.model).filter_by(product_id=product_id)
+            select(self.model.product_id).filter(
+                self.model.product_id.in_(product_ids)
+            )
         )
-        return result.scalars().first() is not None
+        return set(result.scalars().all())
 
     # --- Métodos de Busca Híbrida ---
     async def search_by_vector(
-        self, query_vector: List[float], limit: int
+        self, query_vector: List[float], limit: int, mode: str = None
     ) -> List[ProductEmbedding]:
         """
         Searches for products using vector similarity.
+        mode: 'full' (vector), 'halfvec' or 'binary'. The compact modes pick
+        `limit * VECTOR_RESCORE_FACTOR` candidates from the compact column and
+        rescore them against the full-precision vector. Defaults to VECTOR_SEARCH_MODE.
+        The compact modes require the matching scripts/compact_embeddings_*.sql.
         """
-        stmt = (
-            select(self.model)
-            .order_by(self.model.embedding.cosine_distance(query_vector))
-            .limit(limit)
-        )
+        mode = mode or settings.VECTOR_SEARCH_MODE
+        full_distance = self.model.embedding.cosine_distance(query_vector)
+
+        if mode == "full":
+            stmt = select(self.model).order_by(full_distance).limit(limit)
+        else:
+            compact = product_embeddings_compact.c
+            if mode == "halfvec":
+                first_pass = compact.embedding_half.cosine_distance(query_vector)
+            elif mode == "binary":
+                first_pass = compact.embedding_bin.hamming_distance(
+                    binary_quantize(query_vector)
+                )
+            else:
+                raise ValueError(f"Unknown vector search mode: {mode}")
+
+            candidates = (
+                select(compact.id)
+                .order_by(first_pass)
+                .limit(limit * settings.VECTOR_RESCORE_FACTOR)
+                .subquery()
+            )
+            stmt = (
+                select(self.model)
+                .join(candidates, self.model.id == candidates.c.id)
+                .order_by(full_distance)
+                .limit(limit)
+            )
 
         result = await self.db.execute(stmt)
         return result.scalars().all()
@@ -1,20 +1,34 @@
-from langchain_core.messages import ToolMessage
-from langchain_core.prompts import ChatPromptTemplate
+from functools import lru_cache
 from sqlalchemy.ext.asyncio import AsyncSession
 import re
 
+from app.core.config import settings
 from app.services.llm_factory import get_llm
+from app.services.speculative import SpeculativeSearch
 from app.services.tools import EcommerceTools
 
 
 class AgentService:
-    def __init__(self, db: AsyncSession, user_token: str):
+    def __init__(
+        self,
+        db: AsyncSession,
+        user_token: str,
+        embeddings=None,
+        speculative_search: bool = None,
+    ):
         self.db = db
         self.llm = get_llm()
         self.user_token = user_token
-        self.tools = EcommerceTools(db)
+        # None: segue SPECULATIVE_SEARCH
+        self.speculative_search = (
+            settings.SPECULATIVE_SEARCH
+            if speculative_search is None
+            else speculative_search
+        )
+        self.tools = EcommerceTools(db, embeddings=embeddings)
 
-    def _get_system_instruction(self):
+    @staticmethod
+    def _get_system_instruction():
         return """
             Você é o **Riff**, o assistente virtual da RiffHouse Ecommerce. Sua identidade visual é uma palheta vermelha carismática.
 
@@ -45,7 +59,8 @@ class AgentService:
             "Boas notícias! Seu pedido já está 'Em Transporte' e deve chegar em breve para você começar a tocar."
         """
 
-    def _get_tools_schema(self):
+    @staticmethod
+    def _get_tools_schema():
         """
         Definição dos schemas.
         """
@@ -116,68 +131,32 @@ class AgentService:
         ]
 
     async def handle_request(self, user_message: str):
-        # 1. Definição das Tools (Schemas JSON para a LLM entender)
-        tools_schema = self._get_tools_schema()
-
-        # 2. Bind das tools no modelo
-        llm_with_tools = self.llm.bind_tools(tools_schema)
+        # Import tardio: mantém o import do app leve (ver llm_factory)
+        from langchain_core.prompts import ChatPromptTemplate
 
-        # 3. Prompt do Sistema
-        system_instruction = self._get_system_instruction()
+        # 1-4. Prompt do sistema + LLM com tools (montado uma vez por processo)
+        chain = get_routing_chain()
 
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", system_instruction),
-                ("user", "{input}"),
-            ]
+        # Opcional: adianta a busca no catálogo enquanto a LLM pensa
+        speculative = (
+            SpeculativeSearch(self.tools, user_message)
+            if self.speculative_search
+            else None
         )
+        try:
+            response_msg = await chain.ainvoke({"input": user_message})
 
-        # 4. Primeira Chamada (LLM Pensa)
-        chain = prompt | llm_with_tools
-        response_msg = await chain.ainvoke({"input": user_message})
-
-        # 5. Loop de Execução de Ferramentas
-        if response_msg.tool_calls:
-            # Lista para acumular resultados
-            tool_outputs = []
-
-            for tool_call in response_msg.tool_calls:
-                fn_name = tool_call["name"]
-                args = tool_call["args"]
-                content_result = ""
-
-                print(f"🎸 RiffHouse AI: Executando {fn_name} com {args}")
-
-                try:
-                    # Roteamento manual
-                    if fn_name == "search_catalog":
-                        content_result = await self.tools.search_catalog_tool(
-                            args["query"]
-                        )
-
-                    elif fn_name == "check_order_info":
-                        data = await self.tools.fetch_order_from_java(
-                            order_id=str(args["order_id"]), user_token=self.user_token
-                        )
-                        content_result = str(data)
-
-                    elif fn_name == "product_analytics":
-                        content_result = await self.tools.product_analytics(
-                            intent=args.get("intent"),
-                            category=args.get("category"),
-                            order_by=args.get("order_by"),
-                            limit=args.get("limit", "5"),
-                        )
-                except Exception as e:
-                    content_result = f"Erro ao executar a tool {fn_name}: {e}"
-
-                # Cria a mensagem de resposta da ferramenta
-                tool_outputs.append(
-                    ToolMessage(
-                        content=str(content_result), tool_call_id=tool_call["id"]
-                    )
+            # 5. Loop de Execução de Ferramentas
+            if response_msg.tool_calls:
+                tool_outputs = await self._execute_tool_calls(
+                    response_msg.tool_calls, speculative
                 )
+        finally:
+            # Inclui cancelamento da requisição: a busca não pode ficar órfã
+            if speculative:
+                speculative.discard()
 
+        if response_msg.tool_calls:
             # 6. Segunda Chamada (LLM Gera a Resposta Final com os dados)
             # Reconstruímos o histórico: System -> User -> AI (com intenção de tool) -> Tool Output
             final_prompt = ChatPromptTemplate.from_messages(
@@ -206,6 +185,58 @@ class AgentService:
             print("🤖 RiffHouse IA está respondendo sem utilizar dados da RiffHouse.")
             return self._clean_response(response_msg.content)
 
+    async def _execute_tool_calls(self, tool_calls, speculative=None):
+        """Executa as tools pedidas pela LLM e retorna os ToolMessages."""
+        from langchain_core.messages import ToolMessage
+
+        # Com várias buscas no mesmo turno, a mensagem inteira não representa
+        # nenhuma delas: todas usam a busca normal
+        if speculative and sum(c["name"] == "search_catalog" for c in tool_calls) > 1:
+            speculative.discard()
+
+        # Lista para acumular resultados
+        tool_outputs = []
+
+        for tool_call in tool_calls:
+            fn_name = tool_call["name"]
+            args = tool_call["args"]
+            content_result = ""
+
+            print(f"🎸 RiffHouse AI: Executando {fn_name} com {args}")
+
+            try:
+                # Roteamento manual
+                if fn_name == "search_catalog":
+                    prefetched = (
+                        await speculative.take(args["query"]) if speculative else None
+                    )
+                    content_result = await self.tools.search_catalog_tool(
+                        args["query"], prefetched=prefetched
+                    )
+
+                elif fn_name == "check_order_info":
+                    data = await self.tools.fetch_order_from_java(
+                        order_id=str(args["order_id"]), user_token=self.user_token
+                    )
+                    content_result = str(data)
+
+                elif fn_name == "product_analytics":
+                    content_result = await self.tools.product_analytics(
+                        intent=args.get("intent"),
+                        category=args.get("category"),
+                        order_by=args.get("order_by"),
+                        limit=args.get("limit", "5"),
+                    )
+            except Exception as e:
+                content_result = f"Erro ao executar a tool {fn_name}: {e}"
+
+            # Cria a mensagem de resposta da ferramenta
+            tool_outputs.append(
+                ToolMessage(content=str(content_result), tool_call_id=tool_call["id"])
+            )
+
+        return tool_outputs
+
     def _clean_response(self, text: str) -> str:
         """Remove alucinações de tags XML/Function que vazam no texto"""
         if not text:
@@ -219,3 +250,24 @@ class AgentService:
         cleaned = re.sub(r"{.*?search_catalog.*?}", "", cleaned)
 
         return cleaned.strip()
+
+
+@lru_cache
+def get_routing_chain():
+    """
+    Prompt do sistema + LLM com as tools (1ª chamada), montado uma vez por
+    processo: a conversão dos schemas no bind_tools não se repete a cada
+    requisição. O warm-up do lifespan chama esta função antes do 1º request.
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+
+    # Definição das Tools (Schemas JSON para a LLM entender) e bind no modelo
+    llm_with_tools = get_llm().bind_tools(AgentService._get_tools_schema())
+
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", AgentService._get_system_instruction()),
+            ("user", "{input}"),
+        ]
+    )
+    return prompt | llm_with_tools
@@ -0,0 +1,203 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.agent_service import AgentService
+from app.services.llm_factory import get_embeddings
+
+
+class EmbeddingBatcher:
+    """
+    Agrupa chamadas `aembed_query` concorrentes em um único `embed_documents`.
+    Os últimos `max_cached` textos ficam em cache e não são embedados de novo.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        max_batch_size: int = 100,
+        max_wait: float = 0.05,
+        max_cached: int = 2048,
+    ):
+        self.embeddings = embeddings
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_cached = max_cached
+        self._vectors: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        future = self._vectors.get(text)
+        if future is None:
+            self._evict()
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._vectors[text] = future
+            self._pending.append(text)
+
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        # shield: o cancelamento de um solicitante não cancela o vetor compartilhado
+        return await asyncio.shield(future)
+
+    def _evict(self):
+        """Descarta os vetores mais antigos já resolvidos (cada um ocupa ~25 KB)."""
+        if len(self._vectors) < self.max_cached:
+            return
+        for text in [t for t, f in self._vectors.items() if f.done()]:
+            if len(self._vectors) < self.max_cached:
+                break
+            del self._vectors[text]
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        texts, self._pending = self._pending, []
+        if not texts:
+            return
+
+        task = asyncio.create_task(self._embed(texts))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _embed(self, texts: List[str]):
+        try:
+            # task_type de consulta: mantém os vetores iguais aos do embed_query
+            vectors = await asyncio.to_thread(
+                self.embeddings.embed_documents, texts, task_type="retrieval_query"
+            )
+        except Exception as e:
+            for text in texts:
+                # Remove do cache para que uma nova chamada possa tentar de novo
+                future = self._vectors.pop(text, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, vector in zip(texts, vectors):
+            future = self._vectors.get(text)
+            if future is not None and not future.done():
+                future.set_result(vector)
+
+
+# Limite de conexões para todos os batches deste processo, somados
+_batch_db_slots = asyncio.Semaphore(settings.BATCH_DB_CONNECTIONS)
+
+
+class BatchAgentService(AgentService):
+    """
+    AgentService para o batch: o trabalho de banco (tools) ocupa uma das vagas
+    de _batch_db_slots e a transação termina logo após as tools, devolvendo a
+    conexão ao pool antes da 2ª chamada à LLM.
+    """
+
+    async def _execute_tool_calls(self, tool_calls, speculative=None):
+        async with _batch_db_slots:
+            try:
+                return await super()._execute_tool_calls(tool_calls, speculative)
+            finally:
+                try:
+                    # Encerra a transação (somente leitura)
+                    await self.db.rollback()
+                except Exception as e:
+                    print(f"Erro ao encerrar transação do batch: {e}")
+
+
+class BatchChatService:
+    """
+    Processa uma lista de mensagens pelo agente, com concorrência limitada.
+
+    - Mensagens idênticas são respondidas uma única vez.
+    - Cada worker mantém uma sessão de banco e um AgentService por todo o batch;
+      a conexão só fica presa durante as tools (ver BatchAgentService).
+    - Os embeddings de todas as buscas são agrupados pelo EmbeddingBatcher.
+    - A busca especulativa fica desligada: cada worker usa uma única conexão.
+    """
+
+    def __init__(self, user_token: Optional[str], concurrency: int):
+        self.user_token = user_token
+        self.concurrency = concurrency
+
+    async def stream(self, messages: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Gera um resultado por mensagem de entrada, na ordem em que ficam prontos."""
+        indexes_by_message: Dict[str, List[int]] = {}
+        for index, message in enumerate(messages):
+            indexes_by_message.setdefault(message, []).append(index)
+
+        pending: asyncio.Queue = asyncio.Queue()
+        for message in indexes_by_message:
+            pending.put_nowait(message)
+
+        done: asyncio.Queue = asyncio.Queue()
+        embeddings = EmbeddingBatcher(get_embeddings())
+
+        async def worker():
+            message = None
+            try:
+                async with SessionLocal() as db:
+                    # Sem busca especulativa: ela abriria uma 2ª conexão por worker,
+                    # e o batch busca vazão, não latência
+                    agent = BatchAgentService(
+                        db,
+                        user_token=self.user_token,
+                        embeddings=embeddings,
+                        speculative_search=False,
+                    )
+                    while not pending.empty():
+                        message = pending.get_nowait()
+                        try:
+                            result = {"response": await agent.handle_request(message)}
+                        except Exception as e:
+                            result = {"error": str(e)}
+                        done.put_nowait((message, result))
+                        message = None
+            except Exception as e:
+                # Falha fora do handle_request (sessão, AgentService): o worker
+                # para, mas a mensagem em andamento ainda é reportada
+                print(f"Erro no worker do batch: {e}")
+                if message is not None:
+                    done.put_nowait((message, {"error": str(e)}))
+            finally:
+                # Marcador de fim: o stream sabe quando não virão mais resultados
+                done.put_nowait(None)
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(self.concurrency, len(indexes_by_message)))
+        ]
+
+        try:
+            reported = set()
+            finished = 0
+            while finished < len(workers):
+                item = await done.get()
+                if item is None:
+                    finished += 1
+                    continue
+                message, result = item
+                reported.add(message)
+                for index in indexes_by_message[message]:
+                    yield {"index": index, "message": message, **result}
+
+            # Todos os workers morreram antes de esvaziar a fila
+            for message, indexes in indexes_by_message.items():
+                if message not in reported:
+                    for index in indexes:
+                        yield {
+                            "index": index,
+                            "message": message,
+                            "error": "Mensagem não processada: workers do batch encerrados.",
+                        }
+        finally:
+            # Cliente desconectou ou o batch terminou: encerra os workers
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
@@ -1,18 +1,30 @@
-from langchain_groq import ChatGroq
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from functools import lru_cache
+
 from app.core.config import settings
 
+# Os SDKs de LLM são importados dentro das funções: importar LangChain/Groq/Google
+# custa alguns segundos e não deve atrasar o boot do worker. O warm-up do
+# lifespan (app/core/lifespan.py) chama estas funções antes da primeira requisição.
+
+
+@lru_cache
 def get_llm():
-    """Retorna o modelo de Chat (Groq - Llama 3)"""
+    """Retorna o modelo de Chat (Groq - Llama 3), compartilhado pelo processo"""
+    from langchain_groq import ChatGroq
+
     return ChatGroq(
-        temperature=0, 
+        temperature=0,
         model="llama-3.3-70b-versatile",
         groq_api_key=settings.GROQ_API_KEY
     )
 
+
+@lru_cache
 def get_embeddings():
-    """Retorna o modelo de Embeddings (Google)"""
+    """Retorna o modelo de Embeddings (Google), compartilhado pelo processo"""
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
     return GoogleGenerativeAIEmbeddings(
         model="models/text-embedding-004",
         google_api_key=settings.GOOGLE_API_KEY
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,124 @@
+import asyncio
+import re
+import unicodedata
+from typing import Set
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.repositories.product import ProductRepository
+
+_STOPWORDS = {
+    "que", "para", "com", "uma", "uns", "umas", "dos", "das", "nos", "nas",
+    "qual", "quais", "tem", "voces", "voce", "quero", "queria", "gostaria",
+    "procuro", "estou", "procurando", "alguma", "algum", "por", "favor",
+}
+
+
+def _tokens(text: str) -> Set[str]:
+    """Normaliza (minúsculas, sem acentos) e extrai as palavras relevantes."""
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return {
+        word
+        for word in re.findall(r"\w+", normalized)
+        if len(word) >= 3 and word not in _STOPWORDS
+    }
+
+
+class SpeculationStats:
+    """
+    Contadores da busca especulativa (por processo/worker).
+    hit_ratio / wasted_ratio: fração das buscas iniciadas reaproveitadas / descartadas.
+    mismatches: chamadas de search_catalog cuja query não foi considerada próxima.
+    """
+
+    def __init__(self):
+        self.started = 0
+        self.hits = 0
+        self.wasted = 0
+        self.mismatches = 0
+
+    def as_dict(self):
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "wasted": self.wasted,
+            "mismatches": self.mismatches,
+            "hit_ratio": round(self.hits / self.started, 4) if self.started else 0.0,
+            "wasted_ratio": round(self.wasted / self.started, 4) if self.started else 0.0,
+        }
+
+
+speculation_stats = SpeculationStats()
+
+
+class SpeculativeSearch:
+    """
+    Roda `hybrid_search` com a mensagem crua do usuário enquanto a LLM decide
+    quais ferramentas chamar. Usa uma sessão própria, pois a sessão da
+    requisição não pode ser usada em paralelo.
+    """
+
+    def __init__(self, tools, user_message: str):
+        self.user_message = user_message
+        self._message_tokens = _tokens(user_message)
+        self._resolved = False
+        self._task = asyncio.create_task(self._run(tools))
+        speculation_stats.started += 1
+
+    async def _run(self, tools):
+        async with SessionLocal() as db:
+            return await tools.hybrid_search(
+                self.user_message, repo=ProductRepository(db)
+            )
+
+    def matches(self, query: str) -> bool:
+        """
+        A query da tool é próxima o bastante da mensagem do usuário?
+        - a maior parte das palavras da query aparece na mensagem (a LLM costuma
+          reescrever a query tirando ou trocando uma palavra);
+        - a mensagem não é muito maior que a query: uma query curta dentro de uma
+          mensagem longa pede outra busca.
+        """
+        query_tokens = _tokens(query)
+        if not query_tokens or not self._message_tokens:
+            return False
+        if (
+            len(self._message_tokens) / len(query_tokens)
+            > settings.SPECULATIVE_SEARCH_MAX_LENGTH_RATIO
+        ):
+            return False
+        overlap = len(query_tokens & self._message_tokens) / len(query_tokens)
+        return overlap >= settings.SPECULATIVE_SEARCH_MIN_OVERLAP
+
+    async def take(self, query: str):
+        """
+        Retorna o resultado especulativo se a query for próxima o bastante,
+        ou None para que a busca normal seja executada.
+        """
+        if self._resolved:
+            return None
+        if not self.matches(query):
+            speculation_stats.mismatches += 1
+            return None
+
+        self._resolved = True
+        try:
+            results = await self._task
+        except Exception as e:
+            print(f"Busca especulativa falhou, usando a busca normal: {e}")
+            speculation_stats.wasted += 1
+            return None
+
+        speculation_stats.hits += 1
+        return results
+
+    def discard(self) -> None:
+        """Cancela a busca se ela não foi aproveitada. Pode ser chamado várias vezes."""
+        if self._resolved:
+            return
+        self._resolved = True
+        self._task.cancel()
+        # Evita o aviso de "exception was never retrieved"
+        self._task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        speculation_stats.wasted += 1
@@ -1,15 +1,16 @@
-import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.http_client import get_http_client
 from app.repositories.product import ProductRepository
 from app.services.llm_factory import get_embeddings
 
 
 class EcommerceTools:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, embeddings=None):
         self.db = db
-        self.embeddings = get_embeddings()
+        # Qualquer objeto com `aembed_query` (ex.: EmbeddingBatcher no modo batch)
+        self.embeddings = embeddings or get_embeddings()
         self.repo = ProductRepository(db)
 
     # Analytics (Ranking, Count, Avg)
@@ -79,8 +80,11 @@ class EcommerceTools:
         return "Não entendi o tipo de análise solicitada."
 
     # Busca Híbrida (Texto + Vetor)
-    async def search_catalog_tool(self, query: str):
-        results = await self.hybrid_search(query)
+    async def search_catalog_tool(self, query: str, prefetched=None):
+        """prefetched: resultados já buscados (ex.: pela busca especulativa)."""
+        results = prefetched
+        if results is None:
+            results = await self.hybrid_search(query)
 
         if not results:
             return "Nenhum produto relevante encontrado."
@@ -89,18 +93,22 @@ class EcommerceTools:
             [f"Produto: {p.content} (Preço/Info: {p.metadata_})" for p in results]
         )
 
-    async def hybrid_search(self, query: str, limit: int = 5):
+    async def hybrid_search(
+        self, query: str, limit: int = 5, repo: ProductRepository = None
+    ):
         """
         Executa busca híbrida usando RRF (Reciprocal Rank Fusion).
+        repo: repositório alternativo (outra sessão), para buscas em paralelo.
         """
+        repo = repo or self.repo
         scores = {}
 
         # Busca Vetorial (Semântica)
-        query_vector = get_embeddings().embed_query(query)
-        vector_results = await self.repo.search_by_vector(query_vector, limit * 2)
+        query_vector = await self.embeddings.aembed_query(query)
+        vector_results = await repo.search_by_vector(query_vector, limit * 2)
 
         # Busca Keyword (Full-Text Search)
-        keyword_results = await self.repo.search_by_keyword(query, limit * 2)
+        keyword_results = await repo.search_by_keyword(query, limit * 2)
 
         # Fusão RRF (Reciprocal Rank Fusion)
         product_map = {p.id: p for p in vector_results + keyword_results}
@@ -129,20 +137,20 @@ class EcommerceTools:
         url = f"{settings.BACKEND_URL}/orders/ai/{order_id}"
         headers = {"Authorization": user_token} if user_token else {}
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=headers, timeout=5.0)
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 401 or response.status_code == 403:
-                    return {
-                        "error": "Acesso negado. Você não tem permissão para ver este pedido."
-                    }
-                elif response.status_code == 404:
-                    return {"error": "Pedido não encontrado."}
-                else:
-                    return {
-                        "error": f"Erro no sistema de pedidos: {response.status_code}"
-                    }
-            except Exception as e:
-                return {"error": f"Falha ao conectar no sistema de pedidos: {str(e)}"}
+        client = get_http_client()
+        try:
+            response = await client.get(url, headers=headers, timeout=5.0)
+            if response.status_code == 200:
+                return response.json()
+            elif response.status_code == 401 or response.status_code == 403:
+                return {
+                    "error": "Acesso negado. Você não tem permissão para ver este pedido."
+                }
+            elif response.status_code == 404:
+                return {"error": "Pedido não encontrado."}
+            else:
+                return {
+                    "error": f"Erro no sistema de pedidos: {response.status_code}"
+                }
+        except Exception as e:
+            return {"error": f"Falha ao conectar no sistema de pedidos: {str(e)}"}
@@ -0,0 +1,60 @@
+# Perfil de produção: gunicorn gerenciando workers uvicorn.
+# Uso: gunicorn app.main:app -c gunicorn.conf.py
+import math
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def _cgroup_cpu_limit():
+    """Cota de CPU do container (cgroup v2 ou v1), ou None se não houver limite."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _available_cpus() -> int:
+    """
+    CPUs que o processo pode usar de fato. cpu_count() devolve os cores do host
+    e ignora a cota do container (Docker, Render).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+
+# O serviço é I/O-bound (Groq, Google, Postgres), então um worker async por CPU
+# disponível já satura a CPU. Cada worker carrega LangChain + SDK do Google
+# (~250 MB), por isso o teto via MAX_WORKERS; em instâncias com pouca memória,
+# defina WEB_CONCURRENCY explicitamente.
+_default_workers = min(_available_cpus(), int(os.getenv("MAX_WORKERS", "4")))
+workers = int(os.getenv("WEB_CONCURRENCY") or _default_workers)
+
+# O warm-up do lifespan faz chamadas de rede; dá folga antes do master matar o worker
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
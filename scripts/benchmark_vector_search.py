@@ -0,0 +1,134 @@
+"""
+Compara os modos de busca vetorial (full, halfvec, binary) no catálogo real.
+
+Usa embeddings já gravados como consultas (sem chamadas à API do Google) e mede,
+para cada modo: latência média/p95 e recall@k contra uma busca exata
+(varredura sequencial com o vetor completo). Também mostra o tamanho das
+colunas de vetor e dos índices da tabela.
+
+Uso: python -m scripts.benchmark_vector_search [--queries 50] [--k 5]
+Os modos compactos só são medidos se o respectivo
+scripts/compact_embeddings_{halfvec,binary}.sql tiver sido aplicado.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import select, text
+
+from app.core.database import SessionLocal, engine
+from app.models.product import ProductEmbedding
+from app.repositories.product import ProductRepository
+
+# modo -> coluna de vetor que ele usa na 1ª fase
+MODE_COLUMNS = {
+    "full": "embedding",
+    "halfvec": "embedding_half",
+    "binary": "embedding_bin",
+}
+
+
+async def vector_columns(db):
+    result = await db.execute(
+        text("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = 'product_embeddings'
+          AND column_name IN ('embedding', 'embedding_half', 'embedding_bin')
+    """)
+    )
+    return set(result.scalars().all())
+
+
+async def storage_report(db, columns):
+    sizes = (
+        await db.execute(
+            text(
+                "SELECT "
+                + ", ".join(
+                    f"pg_size_pretty(sum(pg_column_size({name}))) AS {name}"
+                    for name in sorted(columns)
+                )
+                + " FROM product_embeddings"
+            )
+        )
+    ).mappings().one()
+    indexes = (
+        await db.execute(
+            text("""
+            SELECT indexrelname AS name, pg_size_pretty(pg_relation_size(indexrelid)) AS size
+            FROM pg_stat_user_indexes
+            WHERE relname = 'product_embeddings'
+            ORDER BY pg_relation_size(indexrelid) DESC
+        """)
+        )
+    ).mappings().all()
+
+    print("Armazenamento (colunas):")
+    for name, size in sizes.items():
+        print(f"  {name:<40} {size}")
+    print("Armazenamento (índices):")
+    for index in indexes:
+        print(f"  {index['name']:<40} {index['size']}")
+
+
+async def exact_top_k(db, query_vector, k):
+    result = await db.execute(
+        select(ProductEmbedding.id)
+        .order_by(ProductEmbedding.embedding.cosine_distance(query_vector))
+        .limit(k)
+    )
+    return set(result.scalars().all())
+
+
+async def main(n_queries: int, k: int):
+    async with SessionLocal() as db:
+        columns = await vector_columns(db)
+        modes = [mode for mode, name in MODE_COLUMNS.items() if name in columns]
+        await storage_report(db, columns)
+
+        query_vectors = (
+            await db.execute(
+                select(ProductEmbedding.embedding)
+                .where(ProductEmbedding.embedding.is_not(None))
+                .order_by(text("random()"))
+                .limit(n_queries)
+            )
+        ).scalars().all()
+        if not query_vectors:
+            print("Nenhum embedding encontrado em product_embeddings.")
+            return
+
+        # Verdade de referência: sem índices, o Postgres ordena todas as linhas
+        await db.execute(text("SET LOCAL enable_indexscan = off"))
+        await db.execute(text("SET LOCAL enable_bitmapscan = off"))
+        ground_truth = [await exact_top_k(db, list(v), k) for v in query_vectors]
+        # Encerra a transação, desfazendo o SET LOCAL para as buscas medidas
+        await db.rollback()
+
+        repo = ProductRepository(db)
+        print(f"\nBusca ({len(query_vectors)} consultas, k={k}):")
+        print(f"  {'modo':<10} {'média ms':>10} {'p95 ms':>10} {f'recall@{k}':>10}")
+        for mode in modes:
+            latencies, recalls = [], []
+            for vector, expected in zip(query_vectors, ground_truth):
+                start = time.perf_counter()
+                results = await repo.search_by_vector(list(vector), k, mode=mode)
+                latencies.append((time.perf_counter() - start) * 1000)
+                recalls.append(len({p.id for p in results} & expected) / len(expected))
+
+            p95 = sorted(latencies)[max(0, int(len(latencies) * 0.95) - 1)]
+            print(
+                f"  {mode:<10} {statistics.mean(latencies):>10.1f} {p95:>10.1f} "
+                f"{statistics.mean(recalls):>10.3f}"
+            )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.queries, args.k))
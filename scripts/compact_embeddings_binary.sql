@@ -0,0 +1,23 @@
+-- Modo VECTOR_SEARCH_MODE=binary (pgvector >= 0.7).
+-- Cópia quantizada em bits (1 bit por dimensão, 1/32 do vector) usada para
+-- selecionar candidatos por distância de Hamming; os top-k são reordenados
+-- com o vetor completo.
+--
+-- A coluna é gerada a partir de `embedding`: o ADD COLUMN preenche as linhas
+-- existentes e toda ingestão nova já grava as duas representações.
+
+ALTER TABLE product_embeddings
+    ADD COLUMN IF NOT EXISTS embedding_bin bit(768)
+    GENERATED ALWAYS AS (binary_quantize(embedding)::bit(768)) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_product_embeddings_embedding_bin
+    ON product_embeddings USING hnsw (embedding_bin bit_hamming_ops);
+
+-- Índice ANN do vetor completo: neste modo o `embedding` só é lido para
+-- reordenar VECTOR_RESCORE_FACTOR × k linhas buscadas por id, então um índice
+-- hnsw/ivfflat sobre `embedding` não é mais usado e só ocupa memória e I/O.
+-- Confira os índices existentes:
+--   SELECT indexname, indexdef FROM pg_indexes WHERE tablename = 'product_embeddings';
+-- e remova o do vetor completo se o modo full não for mais usado:
+--   DROP INDEX IF EXISTS <nome_do_indice_em_embedding>;
+-- A coluna `embedding` continua necessária para o rescoring.
@@ -0,0 +1,22 @@
+-- Modo VECTOR_SEARCH_MODE=halfvec (pgvector >= 0.7).
+-- Cópia em halfvec (2 bytes por dimensão, metade do vector) usada para
+-- selecionar candidatos; os top-k são reordenados com o vetor completo.
+--
+-- A coluna é gerada a partir de `embedding`: o ADD COLUMN preenche as linhas
+-- existentes e toda ingestão nova já grava as duas representações.
+
+ALTER TABLE product_embeddings
+    ADD COLUMN IF NOT EXISTS embedding_half halfvec(768)
+    GENERATED ALWAYS AS (embedding::halfvec(768)) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_product_embeddings_embedding_half
+    ON product_embeddings USING hnsw (embedding_half halfvec_cosine_ops);
+
+-- Índice ANN do vetor completo: neste modo o `embedding` só é lido para
+-- reordenar VECTOR_RESCORE_FACTOR × k linhas buscadas por id, então um índice
+-- hnsw/ivfflat sobre `embedding` não é mais usado e só ocupa memória e I/O.
+-- Confira os índices existentes:
+--   SELECT indexname, indexdef FROM pg_indexes WHERE tablename = 'product_embeddings';
+-- e remova o do vetor completo se o modo full não for mais usado:
+--   DROP INDEX IF EXISTS <nome_do_indice_em_embedding>;
+-- A coluna `embedding` continua necessária para o rescoring.